@@ -1,54 +1,272 @@
 import aiohttp
+from async_lru import alru_cache
 import websockets
 import asyncio
-import json
+import orjson
+import ijson
 import logging
-import traceback
+import functools
+import inspect
+import random
 from functools import lru_cache
-import re
+from types import MappingProxyType
+from typing import Final, Mapping
 
 # Set up logging
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# Matchmaker regions queried by the get_all_* helpers
+_REGIONS = ("eu1", "na1", "sa1", "asia1", "oceania1", "staging-na")
+
+# Upper bound on memoized endpoint URLs per client
+_MAX_CACHED_URLS = 256
+
+# WebSocket reconnect backoff bounds, in seconds
+_RECONNECT_MIN_DELAY = 0.5
+_RECONNECT_MAX_DELAY = 30
+_RECONNECT_STABLE_AFTER = 30
+
+# Most chat messages joined into one frame when linger_ms is set
+_MAX_BATCH = 16
+
+# Thousands separators stripped from sheet prices
+_PRICE_STRIP_TABLE = str.maketrans('', '', ',./')
+
+
+def _log_error(func, e):
+    # logger.exception only formats the traceback if the record is emitted
+    logger.exception("Error in %s: %s", func.__name__, e)
+    return {"error": str(e)}  # Return error as a dictionary
+
 
 def log_errors(func):
+    # Coroutine functions need an async wrapper, otherwise the call only
+    # creates the coroutine and errors raised while awaiting it escape
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_decorator(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                return _log_error(func, e)
+        return async_decorator
+
+    @functools.wraps(func)
     def decorator(*args, **kwargs):
         try:
             return func(*args, **kwargs)
         except Exception as e:
-            method_name = func.__name__
-            logger.error(f"Error in {method_name}: {str(e)}")
-            error_trace = traceback.format_exc()
-            logger.error(error_trace)
-            return {"error": str(e)}  # Return error as a dictionary
+            return _log_error(func, e)
     return decorator
 
+
+# API error code descriptions used by request_error_code_translate
+_ERROR_CODES: Final[Mapping[int, str]] = MappingProxyType({
+    101: "User is already your friend",
+    102: "User not found",
+    103: "User cannot change name",
+    104: "Already sent friend request",
+    105: "User hasn't sent you a friend request",
+    106: "User already sent you a friend request",
+    107: "You do not have shared connections with this user",
+    108: "You don't have enough coins",
+    109: "You cannot buy your own item",
+    110: "Your profile cannot contain bad words",
+    201: "Item is not in the user's inventory",
+    202: "Item already selected",
+    203: "Item not selectable",
+    204: "Item cannot be sold",
+    205: "Item cannot be opened",
+    206: "User doesn't have this amount of the item",
+    207: "Item is locked. Reason: trade offer",
+    301: "Item not found",
+    302: "Leader positions error",
+    303: "Item ID should exist",
+    401: "Clan name already taken",
+    402: "You can create only one clan",
+    403: "Clan not found",
+    404: "User already invited to the clan",
+    405: "User is in this clan",
+    406: "User already belongs to another clan",
+    407: "User is not a clan member",
+    408: "Invite not found or not related to the user",
+    409: "Your clan name cannot contain bad words",
+    501: "Shop element not found",
+    502: "Not enough money",
+    503: "Item already purchased",
+    504: "You can already change your name",
+    601: "This item isn't for sale anymore",
+    602: "You need level 10 to use the market",
+    801: "You have not linked your Twitch account",
+    802: "Token expired, re-connect your Twitch account",
+    9901: "Database error",
+    9902: "You do not have permission for this",
+    9903: "Cannot do it to yourself",
+    9904: "Exceeded length limit",
+    9905: "Notification not found or not related to the user",
+    9906: "Something went wrong",
+    9907: "Small level for this action",
+    9908: "Your friend exceeds the friends limit",
+    9909: "Exceeded limit of friend requests per day",
+    9910: "Rate limit exceeded",
+    9911: "Service temporarily unavailable",
+})
+
+
+def json_dumps(obj):
+    # aiohttp expects the serializer to return str
+    return orjson.dumps(obj).decode()
+
+
+@lru_cache(maxsize=64)
+def _auth_headers(token):
+    """Build (once per token) a read-only Authorization header mapping"""
+    return MappingProxyType({"Authorization": f"Bearer {token}"})
+
+
 class KirkaAPI:
-    def __init__(self, url=None, rawchaturl=None, token=""):
+    # Static item ids used by the open_*/buy_* shortcuts
+    _CHEST_IDS = {
+        "golden": "077a4cf2-7b76-4624-8be6-4a7316cf5906",
+        "ice": "ec230bdb-4b96-42c3-8bd0-65d204a153fc",
+        "wood": "71182187-109c-40c9-94f6-22dbb60d70ee",
+    }
+    _CHARACTER_CARD_IDS = {
+        "cold": "723c4ba7-57b3-4ae4-b65e-75686fa77bf2",
+        "girls_band": "723c4ba7-57b3-4ae4-b65e-75686fa77bf1",
+        "party": "6281ed5a-663a-45e1-9772-962c95aa4605",
+        "soldiers": "9cc5bd60-806f-4818-a7d4-1ba9b32bd96c",
+    }
+    _STORE_ITEM_IDS = {
+        "wood": 1,
+        "ice": 2,
+        "golden": 3,
+        "party": 4,
+        "soldiers": 5,
+        "girls_band": 6,
+        "cold": 30,
+    }
+
+    def __init__(self, url=None, rawchaturl=None, token="", linger_ms=0):
         self.url = url if url else "kirka.io"
         self.rawchaturl = f"wss://chat.{self.url}/" if not rawchaturl else rawchaturl
+        self._api_base = f"https://api.{self.url}/api"
+        self._mm_host_tail = f".{self.url}/matchmake/"
+        self._urls = {}  # endpoint path -> full URL, filled on first use
         self.token = token
         self.websocket = None
         self.session = None
+        # linger_ms > 0 coalesces chat messages sent within that window
+        self.linger_ms = linger_ms
+        self._send_q = None
+        self._flusher_task = None
+        self._closed = False
+        self._bind_handlers()
+
+    def _bind_handlers(self):
+        """Look up the optional event handlers once instead of per message"""
+        self._h_on_connect = getattr(self, 'on_connect', None)
+        self._h_on_message = getattr(self, 'on_message', None)
+        self._h_trade_message = getattr(self, 'trade_message', None)
+        self._h_trade_send = getattr(self, 'trade_send', None)
+        self._h_trade_accepted = getattr(self, 'trade_accepted', None)
+        self._h_trade_cancel = getattr(self, 'trade_cancel', None)
+        self._any_trade = any((
+            self._h_trade_message, self._h_trade_send,
+            self._h_trade_accepted, self._h_trade_cancel
+        ))
+
+    @staticmethod
+    async def _json(response):
+        """Decode a response body with orjson"""
+        return orjson.loads(await response.read())
+
+    async def _request(self, method, path, token=None, payload=None, swallow=False):
+        """Send a REST API request and decode its JSON response
+
+        With swallow=True an undecodable body yields the HTTP status instead.
+        """
+        headers = _auth_headers(token) if token else None
+        url = self._urls.get(path)
+        if url is None:
+            url = self._api_base + path
+            # Dynamic paths (clan names, api keys) must not grow the table forever
+            if len(self._urls) < _MAX_CACHED_URLS:
+                self._urls[path] = url
+        async with self.session.request(method, url, headers=headers, json=payload) as response:
+            if not swallow:
+                return await self._json(response)
+            try:
+                return await self._json(response)
+            except:
+                return response.status
 
     async def initialize(self):
         """Initialize the API connection"""
-        self.session = aiohttp.ClientSession()
-        await self._connect_websocket()
+        # Pick up handlers attached to the instance after construction
+        self._bind_handlers()
+        connector = aiohttp.TCPConnector(
+            limit=50,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": "kirka-py"},
+            json_serialize=json_dumps
+        )
+        if self.linger_ms > 0:
+            self._send_q = asyncio.Queue()
+            self._flusher_task = asyncio.create_task(self._flusher())
+        await self._supervise()
+
+    async def _supervise(self):
+        """Keep the WebSocket connected, reconnecting with jittered exponential backoff"""
+        loop = asyncio.get_running_loop()
+        delay = _RECONNECT_MIN_DELAY
+        while not self._closed:
+            started = loop.time()
+            try:
+                await self._connect_websocket()
+            except websockets.exceptions.InvalidURI:
+                raise  # misconfiguration, retrying cannot help
+            except Exception:
+                pass  # already reported by _connect_websocket
+            # _listen may exit on an error with the socket still open
+            if self.websocket is not None:
+                try:
+                    await self.websocket.close()
+                except Exception:
+                    pass
+            if self._closed:
+                break
+            # Only a connection that stayed up for a while resets the backoff,
+            # so a server that accepts and immediately drops us is not hammered
+            if loop.time() - started >= _RECONNECT_STABLE_AFTER:
+                delay = _RECONNECT_MIN_DELAY
+            await asyncio.sleep(delay + random.random() * delay)
+            delay = min(delay * 2, _RECONNECT_MAX_DELAY)
 
-    @log_errors
     async def _connect_websocket(self):
         """Establish WebSocket connection"""
         try:
             self.websocket = await websockets.connect(
                 self.rawchaturl,
-                subprotocols=[self.token] if self.token else None
+                subprotocols=[self.token] if self.token else None,
+                # Chat frames are too small for permessage-deflate to pay off
+                compression=None,
+                # Bound buffered inbound frames at the asyncio client's default
+                max_queue=16
             )
-            print("WebSocket connection established.")
+            logger.debug("WebSocket connection established.")
+            # Runs once per connection, including every reconnect
+            if self._h_on_connect is not None:
+                await self._h_on_connect()
             await self._listen()
         except Exception as e:
-            print(f"WebSocket connection failed: {str(e)}")
+            logger.warning("WebSocket connection failed: %s", e)
             raise
 
     async def _listen(self):
@@ -56,49 +274,61 @@ class KirkaAPI:
         try:
             async for message in self.websocket:
                 try:
-                    message_dict = json.loads(message)
+                    # orjson accepts both text (str) and binary (bytes) frames
+                    message_dict = orjson.loads(message)
                     await self._process_message(message_dict)
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse message: {str(e)}")
+                except orjson.JSONDecodeError as e:
+                    logger.warning("Failed to parse message: %s", e)
         except websockets.exceptions.ConnectionClosed:
-            print("WebSocket connection closed")
+            logger.debug("WebSocket connection closed")
         except Exception as e:
-            print(f"Error in message listening: {str(e)}")
+            logger.error("Error in message listening: %s", e)
 
     async def _process_message(self, message):
         """Process incoming messages and trigger appropriate handlers"""
         try:
             # General message handler
-            if hasattr(self, 'on_message'):
-                await self.on_message(message)
+            if self._h_on_message is not None:
+                await self._h_on_message(message)
 
             # Only process if message is of type 13 and has no user
-            if message.get("type") == 13 and message.get("user") is None:
-                message_content = message.get("message", "")
-
-                # Trade message handler
-                if hasattr(self, 'trade_message'):
-                    await self.trade_message(message)
-
-                # Trade send handler
-                if hasattr(self, 'trade_send') and "is offering their" in message_content:
-                    await self.trade_send(message)
-
-                # Trade accepted handler
-                if hasattr(self, 'trade_accepted') and "** accepted **" in message_content and "**'s offer" in message_content:
-                    await self.trade_accepted(message)
-
-                # Trade cancel handler
-                if hasattr(self, 'trade_cancel') and "cancelled their trade" in message_content:
-                    await self.trade_cancel(message)
+            if not self._any_trade:
+                return
+            try:
+                if message["type"] != 13:
+                    return
+            except KeyError:
+                return
+            if message.get("user") is not None:
+                return
+            message_content = message.get("message", "")
+
+            # Trade message handler
+            if self._h_trade_message is not None:
+                await self._h_trade_message(message)
+
+            # Trade send handler
+            if self._h_trade_send is not None and "is offering their" in message_content:
+                await self._h_trade_send(message)
+
+            # Trade accepted handler
+            if self._h_trade_accepted is not None and "** accepted **" in message_content and "**'s offer" in message_content:
+                await self._h_trade_accepted(message)
+
+            # Trade cancel handler
+            if self._h_trade_cancel is not None and "cancelled their trade" in message_content:
+                await self._h_trade_cancel(message)
 
         except Exception as e:
-            print(f"Error processing message: {str(e)}")
+            logger.error("Error processing message: %s", e)
 
     @log_errors
     async def send_global_chat(self, message):
         """Send a message to global chat"""
         if self.websocket:
+            if self._send_q is not None:
+                self._send_q.put_nowait(message)
+                return "QUEUED MESSAGE"
             try:
                 await self.websocket.send(message)
                 return "POSTED MESSAGE"
@@ -106,181 +336,134 @@ class KirkaAPI:
                 return f"Failed to send message: {str(e)}"
         return "WebSocket is not open or not connected."
 
+    async def _flusher(self):
+        """Send queued chat messages, joining those that arrive within linger_ms"""
+        loop = asyncio.get_running_loop()
+        linger = self.linger_ms / 1000
+        while True:
+            batch = [await self._send_q.get()]
+            deadline = loop.time() + linger
+            while len(batch) < _MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._send_q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.websocket.send("\n".join(batch))
+            except Exception as e:
+                logger.error("Failed to send message: %s", e)
+
     @log_errors
     async def close(self):
         """Close all connections"""
+        self._closed = True
         try:
+            if self._flusher_task:
+                self._flusher_task.cancel()
             if self.websocket:
                 await self.websocket.close()
             if self.session:
                 await self.session.close()
         except Exception as e:
-            print(f"Error closing connections: {str(e)}")
+            logger.error("Error closing connections: %s", e)
 
     # User-related methods
     @log_errors
     async def get_stats(self, short_id):
         short_id = short_id.upper().replace("#", "")
-        url = f"https://api.{self.url}/api/user/getProfile"
-        payload = {"id": short_id, "isShortId": True}
-        async with self.session.post(url, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/user/getProfile", payload={"id": short_id, "isShortId": True})
 
     @log_errors
     async def get_stats_long_id(self, long_id):
-            url = f"https://api.{self.url}/api/user/getProfile"
-            payload = {"id": long_id}
-            async with self.session.post(url, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", "/user/getProfile", payload={"id": long_id})
 
     @log_errors
     async def get_my_profile(self, token):
-            url = f"https://api.{self.url}/api/user"
-            headers = {"Authorization": f"Bearer {token}"}
-            async with self.session.get(url, headers=headers) as response:
-                return await response.json()
+        return await self._request("GET", "/user", token)
 
     @log_errors
     async def send_friend_request(self, token, short_id):
-            short_id = short_id.upper().replace("#", "")
-            url = f"https://api.{self.url}/api/user/offerFriendship"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"shortId": short_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        short_id = short_id.upper().replace("#", "")
+        return await self._request("POST", "/user/offerFriendship", token,
+            payload={"shortId": short_id}, swallow=True)
 
     @log_errors
     async def accept_friend_request(self, token, long_id):
-            url = f"https://api.{self.url}/api/user/acceptFriendship"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"userId": long_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/user/acceptFriendship", token,
+            payload={"userId": long_id}, swallow=True)
 
     @log_errors
     async def decline_friend_request(self, token, long_id):
-            url = f"https://api.{self.url}/api/user/cancelFriendship"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"userId": long_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/user/cancelFriendship", token,
+            payload={"userId": long_id}, swallow=True)
 
     @log_errors
     async def remove_friend(self, token, long_id):
-            url = f"https://api.{self.url}/api/user/cancelFriendship"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"userId": long_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/user/cancelFriendship", token,
+            payload={"userId": long_id}, swallow=True)
     @log_errors
     async def rename(self, token, name):
-            url = f"https://api.{self.url}/api/user/updateProfile"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"name": name}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", "/user/updateProfile", token, payload={"name": name})
 
     # Inventory-related methods
     @log_errors
     async def get_inventory(self, api_key, long_id):
-            url = f"https://api.{self.url}/api/inventory/get_{api_key}"
-            payload = {"id": long_id}
-            async with self.session.post(url, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", f"/inventory/get_{api_key}", payload={"id": long_id})
 
     @log_errors
     async def get_my_inventory(self, token):
-            url = f"https://api.{self.url}/api/inventory"
-            headers = {"Authorization": f"Bearer {token}"}
-            async with self.session.get(url, headers=headers) as response:
-                return await response.json()
+        return await self._request("GET", "/inventory", token)
 
     @log_errors
     async def open_chest(self, token, item_id):
-            url = f"https://api.{self.url}/api/inventory/openChest"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"id": item_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                return await response.json()
-    @log_errors
+        return await self._request("POST", "/inventory/openChest", token, payload={"id": item_id})
+
+    async def open_chest_kind(self, token, kind):
+        return await self.open_chest(token, self._CHEST_IDS[kind])
+
     async def open_golden_chest(self, token):
-        return await self.open_chest(token, "077a4cf2-7b76-4624-8be6-4a7316cf5906")
+        return await self.open_chest_kind(token, "golden")
 
-    @log_errors
     async def open_ice_chest(self, token):
-        return await self.open_chest(token, "ec230bdb-4b96-42c3-8bd0-65d204a153fc")
+        return await self.open_chest_kind(token, "ice")
 
-    @log_errors
     async def open_wood_chest(self, token):
-        return await self.open_chest(token, "71182187-109c-40c9-94f6-22dbb60d70ee")
+        return await self.open_chest_kind(token, "wood")
 
     @log_errors
     async def open_character_card(self, token, item_id):
-            url = f"https://api.{self.url}/api/inventory/openCharacterCard"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"id": item_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", "/inventory/openCharacterCard", token, payload={"id": item_id})
+
+    async def open_character_card_kind(self, token, kind):
+        return await self.open_character_card(token, self._CHARACTER_CARD_IDS[kind])
 
-    @log_errors
     async def open_cold_character_card(self, token):
-        return await self.open_character_card(token, "723c4ba7-57b3-4ae4-b65e-75686fa77bf2")
+        return await self.open_character_card_kind(token, "cold")
 
-    @log_errors
     async def open_girls_band_character_card(self, token):
-        return await self.open_character_card(token, "723c4ba7-57b3-4ae4-b65e-75686fa77bf1")
+        return await self.open_character_card_kind(token, "girls_band")
 
-    @log_errors
     async def open_party_character_card(self, token):
-        return await self.open_character_card(token, "6281ed5a-663a-45e1-9772-962c95aa4605")
+        return await self.open_character_card_kind(token, "party")
 
-    @log_errors
     async def open_soldiers_character_card(self, token):
-        return await self.open_character_card(token, "9cc5bd60-806f-4818-a7d4-1ba9b32bd96c")
+        return await self.open_character_card_kind(token, "soldiers")
 
     @log_errors
     async def equip_item(self, token, item_id):
-            url = f"https://api.{self.url}/api/inventory/take"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"id": item_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/inventory/take", token, payload={"id": item_id}, swallow=True)
     @log_errors
     async def list_item(self, token, item_id, price):
-            url = f"https://api.{self.url}/api/inventory/market"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"id": item_id, "price": price}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/inventory/market", token,
+            payload={"id": item_id, "price": price}, swallow=True)
 
     @log_errors
     async def quick_sell(self, token, item_id, amount):
-            url = f"https://api.{self.url}/api/inventory/sell"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"id": item_id, "amount": amount}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/inventory/sell", token,
+            payload={"id": item_id, "amount": amount}, swallow=True)
 
     async def quick_sell_one(self, token, item_id):
         return await self.quick_sell(token, item_id, 1)
@@ -288,148 +471,80 @@ class KirkaAPI:
     # Market-related methods
     @log_errors
     async def get_market(self, token):
-            url = f"https://api.{self.url}/api/market"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"search": "", "rarity": ""}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", "/market", token, payload={"search": "", "rarity": ""})
 
     @log_errors
     async def search_market(self, token, skin=None, rarity=None):
-            url = f"https://api.{self.url}/api/market"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"search": skin or "", "rarity": rarity or ""}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                return await response.json()
+        return await self._request("POST", "/market", token,
+            payload={"search": skin or "", "rarity": rarity or ""})
 
     @log_errors
     async def market_buy(self, token, long_id, item_id):
-            url = f"https://api.{self.url}/api/market/buy"
-            headers = {"Authorization": f"Bearer {token}"}
-            payload = {"userId": long_id, "itemId": item_id}
-            async with self.session.post(url, headers=headers, json=payload) as response:
-                try:
-                    return await response.json()
-                except:
-                    return response.status
+        return await self._request("POST", "/market/buy", token,
+            payload={"userId": long_id, "itemId": item_id}, swallow=True)
 
     # Rewards-related methods
     @log_errors
     async def get_rewards(self, token):
-            url = f"https://api.{self.url}/api/rewards"
-            headers = {"Authorization": f"Bearer {token}"}
-            async with self.session.get(url, headers=headers) as response:
-                return await response.json()
+        return await self._request("GET", "/rewards", token)
 
 
     @log_errors
     async def get_ads(self, token):
-        url = f"https://api.{self.url}/api/rewards/ad"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.post(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("POST", "/rewards/ad", token)
 
     @log_errors
     async def get_ad_reward(self):
-        url = f"https://api.{self.url}/api/rewards/ad"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/rewards/ad")
 
     @log_errors
     async def claim_rewards(self, token):
-        url = f"https://api.{self.url}/api/rewards/take"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.post(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("POST", "/rewards/take", token)
 
     @log_errors
     async def claim_ad(self, token):
-        url = f"https://api.{self.url}/api/rewards/claimAd"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.get(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("GET", "/rewards/claimAd", token)
 
     # Clans-related methods
     @log_errors
     async def get_clan(self, name):
-        url = f"https://api.{self.url}/api/clans/{name}"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", f"/clans/{name}")
     @log_errors
     async def invite_clan(self, token, short_id):
-        url = f"https://api.{self.url}/api/clans/invite"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"shortId": short_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/invite", token,
+            payload={"shortId": short_id}, swallow=True)
 
     async def get_my_clan(self, token):
-        url = f"https://api.{self.url}/api/clans/mine"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.get(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("GET", "/clans/mine", token)
 
     @log_errors
     async def update_clan_description(self, token, clan_id, description):
-        url = f"https://api.{self.url}/api/clans/updateClan"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"id": clan_id, "description": description}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/clans/updateClan", token,
+            payload={"id": clan_id, "description": description})
 
     @log_errors
     async def update_clan_discord_link(self, token, clan_id, discord_link):
-        url = f"https://api.{self.url}/api/clans/updateClan"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"id": clan_id, "discordLink": discord_link}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/clans/updateClan", token,
+            payload={"id": clan_id, "discordLink": discord_link})
 
     @log_errors
     async def accept_invite(self, token, invite_id):
-        url = f"https://api.{self.url}/api/clans/acceptInvite"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"inviteId": invite_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/acceptInvite", token,
+            payload={"inviteId": invite_id}, swallow=True)
 
     @log_errors
     async def decline_invite(self, token, invite_id):
-        url = f"https://api.{self.url}/api/clans/cancelInvite"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"inviteId": invite_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/cancelInvite", token,
+            payload={"inviteId": invite_id}, swallow=True)
 
     @log_errors
     async def leave_clan(self, token):
-        url = f"https://api.{self.url}/api/clans/leave"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.post(url, headers=headers) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/leave", token, swallow=True)
 
     @log_errors
     async def set_role(self, token, long_id, role):
-        url = f"https://api.{self.url}/api/clans/updateMember"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"memberId": long_id, "role": role}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/updateMember", token,
+            payload={"memberId": long_id, "role": role}, swallow=True)
 
     @log_errors
     async def set_officer(self, token, long_id):
@@ -445,171 +560,108 @@ class KirkaAPI:
 
     @log_errors
     async def clan_kick(self, token, long_id):
-        url = f"https://api.{self.url}/api/clans/kickMember"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"memberId": long_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("POST", "/clans/kickMember", token,
+            payload={"memberId": long_id}, swallow=True)
 
     @log_errors
     async def create_clan(self, token, name):
-        url = f"https://api.{self.url}/api/clans/create"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"name": name}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/clans/create", token, payload={"name": name})
 
     # Notification-related methods
     @log_errors
     async def get_notification(self, token):
-        url = f"https://api.{self.url}/api/notification"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.get(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("GET", "/notification", token)
 
     @log_errors
     async def saw_notification(self, token):
-        url = f"https://api.{self.url}/api/notification/saw"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.get(url, headers=headers) as response:
-            try:
-                return await response.json()
-            except:
-                return response.status
+        return await self._request("GET", "/notification/saw", token, swallow=True)
 
     # Leaderboard-related methods
     @log_errors
     async def get_solo_leaderboard(self):
-        url = f"https://api.{self.url}/api/leaderboard/solo"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/leaderboard/solo")
 
     @log_errors
     async def get_clan_leaderboard(self):
-        url = f"https://api.{self.url}/api/leaderboard/clanChampionship"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/leaderboard/clanChampionship")
 
     # Shop-related methods
     @log_errors
     async def get_sets(self):
-        url = f"https://api.{self.url}/api/shop/sets"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/shop/sets")
 
     @log_errors
     async def get_bundles(self):
-        url = f"https://api.{self.url}/api/shop/bundles"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/shop/bundles")
 
     @log_errors
     async def store_buy(self, token, item_id):
-        url = f"https://api.{self.url}/api/shop/buy"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"id": item_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/shop/buy", token, payload={"id": item_id})
 
     @log_errors
     async def store_buy_set(self, token, set_id):
-        url = f"https://api.{self.url}/api/shop/buySet"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"id": set_id}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/shop/buySet", token, payload={"id": set_id})
+
+    async def buy_kind(self, token, kind):
+        return await self.store_buy(token, self._STORE_ITEM_IDS[kind])
 
-    @log_errors
     async def buy_wood(self, token):
-        return await self.store_buy(token, 1)
+        return await self.buy_kind(token, "wood")
 
-    @log_errors
     async def buy_ice(self, token):
-        return await self.store_buy(token, 2)
+        return await self.buy_kind(token, "ice")
 
-    @log_errors
     async def buy_golden(self, token):
-        return await self.store_buy(token, 3)
+        return await self.buy_kind(token, "golden")
 
-    @log_errors
     async def buy_party(self, token):
-        return await self.store_buy(token, 4)
+        return await self.buy_kind(token, "party")
 
-    @log_errors
     async def buy_soldiers(self, token):
-        return await self.store_buy(token, 5)
+        return await self.buy_kind(token, "soldiers")
 
-    @log_errors
     async def buy_girls_band(self, token):
-        return await self.store_buy(token, 6)
+        return await self.buy_kind(token, "girls_band")
 
-    @log_errors
     async def buy_cold(self, token):
-        return await self.store_buy(token, 30)
+        return await self.buy_kind(token, "cold")
 
     # Quests-related methods
     @log_errors
     async def get_all_quests(self, token):
-        url = f"https://api.{self.url}/api/quests"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/quests", token, payload={})
 
     @log_errors
     async def get_daily_quests(self, token):
-        url = f"https://api.{self.url}/api/quests"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"type": "daily"}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/quests", token, payload={"type": "daily"})
 
     @log_errors
     async def get_event_quests(self, token):
-        url = f"https://api.{self.url}/api/quests"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"type": "event"}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/quests", token, payload={"type": "event"})
 
     @log_errors
     async def get_hourly_quests(self, token):
-        url = f"https://api.{self.url}/api/quests"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"type": "hourly"}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/quests", token, payload={"type": "hourly"})
 
     @log_errors
     async def get_quests(self, token, quest_type):
-        url = f"https://api.{self.url}/api/quests"
-        headers = {"Authorization": f"Bearer {token}"}
-        payload = {"type": quest_type}
-        async with self.session.post(url, headers=headers, json=payload) as response:
-            return await response.json()
+        return await self._request("POST", "/quests", token, payload={"type": quest_type})
 
     # Content-related methods
     @log_errors
     async def get_videos(self):
-        url = f"https://api.{self.url}/api/videos"
-        async with self.session.post(url) as response:
-            return await response.json()
+        return await self._request("POST", "/videos")
 
     @log_errors
     async def get_streams(self):
-        url = f"https://api.{self.url}/api/twitch"
-        async with self.session.get(url) as response:
-            return await response.json()
+        return await self._request("GET", "/twitch")
 
     # Matchmaker-related methods
     @log_errors
     async def get_lobbies(self, region):
-        url = f"https://{region}.{self.url}/matchmake/"
+        url = "https://" + region + self._mm_host_tail
         async with self.session.get(url) as response:
-            return await response.json()
+            return await self._json(response)
 
     @log_errors
     async def get_eu_lobbies(self):
@@ -635,13 +687,22 @@ class KirkaAPI:
     async def get_staging_lobbies(self):
         return await self.get_lobbies("staging-na")
 
+    async def get_all_lobbies(self):
+        """Fetch lobbies for every region concurrently"""
+        results = await asyncio.gather(*(self.get_lobbies(r) for r in _REGIONS))
+        return dict(zip(_REGIONS, results))
+
     @log_errors
     async def get_playercount(self, region):
-        url = f"https://{region}.{self.url}/matchmake/"
+        url = "https://" + region + self._mm_host_tail
         try:
             async with self.session.get(url) as response:
-                data = await response.json()
-                return sum(lobby["clients"] for lobby in data)
+                # Only the per-lobby client counts are needed, so stream them
+                # out of the body instead of decoding every lobby object
+                total = 0
+                async for clients in ijson.items_async(response.content, "item.clients"):
+                    total += clients
+                return total
         except:
             return 0
 
@@ -669,6 +730,11 @@ class KirkaAPI:
     async def get_staging_playercount(self):
         return await self.get_playercount("staging-na")
 
+    async def get_all_playercounts(self):
+        """Fetch player counts for every region concurrently"""
+        results = await asyncio.gather(*(self.get_playercount(r) for r in _REGIONS))
+        return dict(zip(_REGIONS, results))
+
     # No API fetches
     async def get_character_render(self, skin_name):
         # TODO: steal carry's code
@@ -678,54 +744,40 @@ class KirkaAPI:
         # TODO: steal carry's code
         raise NotImplementedError
 
-    @lru_cache(maxsize=None)
+    # Refetch sheets every few minutes so price updates are picked up
+    @alru_cache(maxsize=32, ttl=300)
+    async def _load_sheet_index(self, opensheeturl, namefield, pricefield):
+        """Fetch a price sheet once and index it by lowercased skin name"""
+        async with self.session.get(opensheeturl) as response:
+            data = await self._json(response)
+
+        index = {}
+        for item in data:
+            if item.get(namefield) and item.get(pricefield):
+                price_str = item[pricefield].split()[0].split("?")[0]
+                try:
+                    price = int(price_str.translate(_PRICE_STRIP_TABLE))
+                except ValueError:
+                    continue
+                index.setdefault(item[namefield].lower(), price)
+        return index
+
     async def pricebvl(self, skinname):
-        try:
-            async with self.session.get(
-                    "https://opensheet.elk.sh/1tzHjKpu2gYlHoCePjp6bFbKBGvZpwDjiRzT9ZUfNwbY/Alphabetical") as response:
-                data = await response.json()
-
-            skinname = skinname.lower()
-            for item in data:
-                if item.get("Skin Name") and item.get("Price"):
-                    if item["Skin Name"].lower() == skinname:
-                        price_str = item["Price"].split()[0].split("?")[0]
-                        return int(re.sub(r'[,./]', '', price_str))
-            return 0
-        except Exception as e:
-            return str(e)
+        return await self.pricecustom(
+            skinname, "Skin Name", "Price",
+            "https://opensheet.elk.sh/1tzHjKpu2gYlHoCePjp6bFbKBGvZpwDjiRzT9ZUfNwbY/Alphabetical")
 
     @log_errors
-    @lru_cache(maxsize=None)
     async def priceyzzzmtz(self, skinname):
-        try:
-            async with self.session.get(
-                    "https://opensheet.elk.sh/1VqX9kwJx0WlHWKCJNGyIQe33APdUSXz0hEFk6x2-3bU/Sorted+View") as response:
-                data = await response.json()
-
-            skinname = skinname.lower()
-            for item in data:
-                if item.get("Name") and item.get("Base Value"):
-                    if item["Name"].lower() == skinname:
-                        price_str = item["Base Value"].split()[0].split("?")[0]
-                        return int(re.sub(r'[,./]', '', price_str))
-            return 0
-        except Exception as e:
-            return str(e)
+        return await self.pricecustom(
+            skinname, "Name", "Base Value",
+            "https://opensheet.elk.sh/1VqX9kwJx0WlHWKCJNGyIQe33APdUSXz0hEFk6x2-3bU/Sorted+View")
+
     @log_errors
-    @lru_cache(maxsize=None)
     async def pricecustom(self, skinname, namefield, pricefield, opensheeturl):
         try:
-            async with self.session.get(opensheeturl) as response:
-                data = await response.json()
-
-            skinname = skinname.lower()
-            for item in data:
-                if item.get(namefield) and item.get(pricefield):
-                    if item[namefield].lower() == skinname:
-                        price_str = item[pricefield].split()[0].split("?")[0]
-                        return int(re.sub(r'[,./]', '', price_str))
-            return 0
+            index = await self._load_sheet_index(opensheeturl, namefield, pricefield)
+            return index.get(skinname.lower(), 0)
         except Exception as e:
             return str(e)
 
@@ -743,71 +795,11 @@ class KirkaAPI:
 
     # Error code translation
     async def request_error_code_translate(self, request_code):
-        error_codes = {
-            101: "User is already your friend",
-            102: "User not found",
-            103: "User cannot change name",
-            104: "Already sent friend request",
-            105: "User hasn't sent you a friend request",
-            106: "User already sent you a friend request",
-            107: "You do not have shared connections with this user",
-            108: "You don't have enough coins",
-            109: "You cannot buy your own item",
-            110: "Your profile cannot contain bad words",
-            201: "Item is not in the user's inventory",
-            202: "Item already selected",
-            203: "Item not selectable",
-            204: "Item cannot be sold",
-            205: "Item cannot be opened",
-            206: "User doesn't have this amount of the item",
-            207: "Item is locked. Reason: trade offer",
-            301: "Item not found",
-            302: "Leader positions error",
-            303: "Item ID should exist",
-            401: "Clan name already taken",
-            402: "You can create only one clan",
-            403: "Clan not found",
-            404: "User already invited to the clan",
-            405: "User is in this clan",
-            406: "User already belongs to another clan",
-            407: "User is not a clan member",
-            408: "Invite not found or not related to the user",
-            409: "Your clan name cannot contain bad words",
-            501: "Shop element not found",
-            502: "Not enough money",
-            503: "Item already purchased",
-            504: "You can already change your name",
-            601: "This item isn't for sale anymore",
-            602: "You need level 10 to use the market",
-            801: "You have not linked your Twitch account",
-            802: "Token expired, re-connect your Twitch account",
-            9901: "Database error",
-            9902: "You do not have permission for this",
-            9903: "Cannot do it to yourself",
-            9904: "Exceeded length limit",
-            9905: "Notification not found or not related to the user",
-            9906: "Something went wrong",
-            9907: "Small level for this action",
-            9908: "Your friend exceeds the friends limit",
-            9909: "Exceeded limit of friend requests per day",
-            9910: "Rate limit exceeded",
-            9911: "Service temporarily unavailable",
-        }
-        return error_codes.get(request_code, "Unknown error")
+        return _ERROR_CODES.get(request_code, "Unknown error")
 
     # Forbidden resources
     async def get_shop(self, token):
-        url = f"https://api.{self.url}/api/shop"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.get(url, headers=headers) as response:
-            return await response.json()
+        return await self._request("GET", "/shop", token)
 
     async def reports(self, token):
-        url = f"https://api.{self.url}/api/inspector/reports"
-        headers = {"Authorization": f"Bearer {token}"}
-        async with self.session.post(url, headers=headers) as response:
-            return await response.json()
-
-    # Cleanup
-    async def close(self):
-        await self.session.close()
+        return await self._request("POST", "/inspector/reports", token)
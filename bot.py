@@ -1,13 +1,19 @@
 import asyncio
 import aiohttp
-from expiringdict import ExpiringDict
+from utils.ttldict import TTLDict
 from typing import Dict, Optional, Callable
 from models.ctx import CommandContext
-from api.client import KirkaAPI
+from api.client import KirkaAPI, json_dumps
 from utils.cooldown import CooldownController
 from utils.response import CommandResponse
+import logging
 import traceback, sys
 
+logger = logging.getLogger(__name__)
+
+# Shared fallback for commands without a blacklist, avoids allocating per lookup
+_EMPTY_SET = frozenset()
+
 # noinspection PyUnresolvedReferences
 class KirkaBot:
     def __init__(self, prefix: str = ".", token: Optional[str] = None):
@@ -15,14 +21,18 @@ class KirkaBot:
         self.token = token
         self.commands: Dict[str, Callable] = {}  # Stores command functions
         self.api = KirkaAPI(token=token)
+        self.session: Optional[aiohttp.ClientSession] = None
         self.cooldowns = CooldownController()
         self.api._process_message = self.handle_message
+        self.api.on_connect = self._on_connect
         self.blacklists = {
             'silent': set(),
             'notified': set(),
-            'command': ExpiringDict(max_len=1000, max_age_seconds=3600)
+            'command': TTLDict(max_len=1000, max_age_seconds=3600)
         }
         self.discarded_first_message = False
+        self._outbox = asyncio.Queue()  # replies waiting to be sent
+        self._drain_task = None
 
     def command(self, name: str = None, description: str = "", aliases: list = None, hidden: bool = False):
         # noinspection PyTypeChecker
@@ -42,15 +52,21 @@ class KirkaBot:
 
     async def _init_session(self):
         # Initialize aiohttp ClientSession
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(json_serialize=json_dumps)
 
     async def close_session(self):
         # Close the aiohttp session
+        if self._drain_task:
+            self._drain_task.cancel()
         if self.session:
             await self.session.close()
 
+    async def _on_connect(self):
+        # Every new connection starts with a backlog frame that must be skipped
+        self.discarded_first_message = False
+
     async def handle_message(self, message: dict):
-        if not self.session:
+        if self.session is None:
             await self._init_session()
 
         # Ignore the first message
@@ -63,85 +79,73 @@ class KirkaBot:
 
             if msg_type == 3:  # Bundle of messages
                 if 'messages' in message:
-                    for bundled_msg in message['messages']:
-                        await self._process_single_message(bundled_msg)
+                    # Each message may await a reply send, so let them overlap;
+                    # failures are already logged by _process_single_message
+                    await asyncio.gather(
+                        *(self._process_single_message(m) for m in message['messages']),
+                        return_exceptions=True
+                    )
             elif msg_type == 2:  # Single message
                 await self._process_single_message(message)
             else:  # Unknown type
                 try:
                     await self._process_single_message(message)
                 except Exception as e:
-                    print(f"Failed to process message of unknown type {msg_type}:")
-                    traceback.print_exc()
+                    # Unknown message types are routine, keep them out of the error log
+                    logger.debug("Failed to process message of unknown type %s", msg_type, exc_info=True)
                     return
 
         except Exception as e:
-            print("Error in handle_message:")
-            traceback.print_exc()
+            logger.exception("Error in handle_message")
 
     async def _process_single_message(self, message: dict):
         try:
-            # Create normalized message structure
-            normalized_message = {
-                'content': message.get('message', ''),
-                'author': {
-                    'id': message['user'].get('id', ''),
-                    'short_id': message['user'].get('shortId', ''),
-                    'name': message['user'].get('name', ''),
-                    'role': message['user'].get('role', ''),
-                    'level': message['user'].get('level', 0)
-                },
-                'type': message.get('type'),
-                'raw': message
-            }
-
-            # Create context and check if it's a command
-            ctx = self.create_context(normalized_message)
-
-            if not ctx.content.startswith(self.prefix):
+            # Most chat is not a command, so check the prefix before building a context
+            if not message.get('message', '').startswith(self.prefix):
                 return
 
+            ctx = self.create_context(message)
+
             user_id = ctx.author.short_id
             getblacklist = self._check_blacklists(user_id, ctx.command_name)
 
             if getblacklist == 1:
                 return
 
-            if ctx.command_name in self.commands:
+            command = self.commands.get(ctx.command_name)
+            if command is not None:
                 if getblacklist == 2:
                     await ctx.reply("Blacklisted")
                 elif getblacklist == 3:
                     await ctx.reply("Blacklisted from using this command.")
                 else:
-                    await self._execute_command(ctx)
+                    await self._execute_command(ctx, command)
 
         except Exception as e:
-            print("Error in _process_single_message:")
-            traceback.print_exc()
+            logger.exception("Error in _process_single_message")
             raise
 
-    async def _execute_command(self, ctx):
+    async def _execute_command(self, ctx, command: Optional[dict] = None):
         cmd_name = ctx.command_name
-        if cmd_name not in self.commands:
+        if command is None:
+            command = self.commands.get(cmd_name)
+        if command is None:
             await ctx.reply("Command not found.")
             return
 
-        command = self.commands[cmd_name]
         try:
-            if self.cooldowns.check(ctx.author.id, cmd_name):
-                remaining = self.cooldowns.remaining(ctx.author.id, cmd_name)
+            remaining = self.cooldowns.status(ctx.author.id, cmd_name)
+            if remaining is not None:
                 await ctx.reply(f"Command on cooldown. Wait {round(remaining,2)}s")
                 return
 
-            # Get the message content and remove the prefix + command name
-            args = ctx.content[len(self.prefix + cmd_name):].strip()
-
-            await command['function'](ctx, args)
+            # Start the cooldown before awaiting the command, so a second copy of
+            # it running concurrently (e.g. from the same bundle) is rejected
             self.cooldowns.update(ctx.author.id, cmd_name)
+            await command['function'](ctx, ctx.args_str)
 
         except Exception as e:
-            print("Error in _execute_command:")
-            traceback.print_exc()
+            logger.exception("Error in _execute_command")
             error_response = CommandResponse().add_error(f"{str(e)}\n```\n{traceback.format_exc()}```")
             await ctx.reply(error_response.build())
 
@@ -149,14 +153,28 @@ class KirkaBot:
         return CommandContext(message, self)
 
     def _check_blacklists(self, user_id: str, command_name: str):
-        if user_id in self.blacklists['silent']:
+        blacklists = self.blacklists
+        if user_id in blacklists['silent']:
             return 1
-        if user_id in self.blacklists['notified']:
+        if user_id in blacklists['notified']:
             return 2
-        if user_id in self.blacklists['command'].get(command_name, set()):
+        if user_id in blacklists['command'].get(command_name, _EMPTY_SET):
             return 3
         return False
 
+    async def queue_reply(self, response: str):
+        # Started on first use so replies are sent however the bot is driven
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_outbox())
+        await self._outbox.put(response)
+
+    async def _drain_outbox(self):
+        # Replies go out one frame each, back-to-back from this single task;
+        # merging them is left to the API's opt-in linger_ms
+        while True:
+            response = await self._outbox.get()
+            await self.api.send_global_chat(response)
+
     async def start(self):
         try:
             await self._init_session()
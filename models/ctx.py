@@ -1,41 +1,50 @@
+import logging
 from typing import Dict, Any
 from models.user import UserProfile
 
+logger = logging.getLogger(__name__)
+
+
+class Author:
+    __slots__ = ('id', 'short_id', 'name', 'role', 'level')
+
+    def __init__(self, user: dict):
+        self.id = user.get('id', '')
+        self.short_id = user.get('shortId', '')
+        self.name = user.get('name', '')
+        self.role = user.get('role', '')
+        self.level = user.get('level', 0)
+
+
 class CommandContext:
+    __slots__ = ('bot', 'raw', 'message', 'content', 'author', 'command_name', 'args_str', 'args')
+
     def __init__(self, message: dict, bot):
-        print(message)
+        logger.debug("ctx msg: %s", message)
         self.bot = bot
-        self.message = message['content']
+        self.raw = message
+        self.message = message.get('message', '')
         self.content = self.message
-        self.author = self._create_author(message['author'])
-        self.command_name = self._parse_command_name()
-        self.args = self._parse_args()
-
-    def _create_author(self, author_data: dict):
-        return type('Author', (), {
-            'id': author_data.get('id', ''),
-            'short_id': author_data.get('short_id', ''),
-            'name': author_data.get('name', ''),
-            'role': author_data.get('role', ''),
-            'level': author_data.get('level', 0)
-        })
-
-    def _parse_command_name(self):
-        if not self.content.startswith(self.bot.prefix):
-            return ''
-        parts = self.content[len(self.bot.prefix):].split()
-        return parts[0].lower() if parts else ''
-
-    def _parse_args(self):
-        if not self.content.startswith(self.bot.prefix):
-            return []
-        parts = self.content[len(self.bot.prefix):].split()
-        return parts[1:] if len(parts) > 1 else []
+        self.author = Author(message['user'])
+        self.command_name, self.args_str = self._parse_command()
+        self.args = self.args_str.split()
+
+    def _parse_command(self):
+        prefix = self.bot.prefix
+        tail = self.content.removeprefix(prefix)
+        # removeprefix hands back the same object when the prefix is absent
+        if tail is self.content and prefix:
+            return '', ''
+        # Split off the command name once, leaving the argument tail intact
+        parts = tail.split(None, 1)
+        if not parts:
+            return '', ''
+        return parts[0].lower(), parts[1].rstrip() if len(parts) > 1 else ''
 
     async def reply(self, response: str, raw=False):
         if not raw:
             response = f"{self.author.short_id} -|- {response}"
-        await self.bot.api.send_global_chat(response)
-        print(response)
+        await self.bot.queue_reply(response)
+        logger.debug("reply: %s", response)
 
 
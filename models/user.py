@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import cached_property
 from typing import Dict, Optional
 
 
@@ -35,7 +36,7 @@ class UserProfile:
     def total_xp(self) -> int:
         return self.raw['totalXp']
 
-    @property
+    @cached_property
     def xp_progress(self) -> str:
         current = self.raw['xpSinceLastLevel']
         needed = self.raw['xpUntilNextLevel']
@@ -49,39 +50,37 @@ class UserProfile:
     def diamonds(self) -> int:
         return self.raw['diamonds']
 
-    @property
+    @cached_property
     def join_date(self) -> str:
-        return datetime.strptime(
-            self.raw['createdAt'],
-            '%Y-%m-%dT%H:%M:%S.%fZ'
-        ).strftime('%B %d, %Y')
+        # fromisoformat accepts the trailing "Z" since Python 3.11
+        return datetime.fromisoformat(self.raw['createdAt']).strftime('%B %d, %Y')
 
     @property
     def clan(self) -> Optional[str]:
         return self.raw.get('clan')
 
-    @property
+    @cached_property
     def weapon_skin(self) -> str:
         skin = self.raw['activeWeapon1Skin']
         return f"{skin['name']} ({skin['rarity']})"
 
-    @property
+    @cached_property
     def body_skin(self) -> str:
         skin = self.raw['activeBodySkin']
         return f"{skin['name']} ({skin['rarity']})"
 
-    @property
+    @cached_property
     def kd_ratio(self) -> float:
         return self.stats.get('kills', 1) / self.stats.get('deaths', 1)
 
-    @property
+    @cached_property
     def win_rate(self) -> float:
         return self.stats.get('wins', 0) / self.stats.get('games', 1)
 
-    @property
+    @cached_property
     def headshot_rate(self) -> float:
         return self.stats.get('headshots', 0) / self.stats.get('kills', 1)
 
-    @property
+    @cached_property
     def score_per_game(self) -> float:
         return self.stats.get('scores', 0) / self.stats.get('games', 1)
\ No newline at end of file
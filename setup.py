@@ -20,7 +20,9 @@ setup(
         "aiohttp",
         "websockets",
         "asyncio",
-        "expiringdict",
-        "websockets"
+        "websockets",
+        "orjson",
+        "async-lru",
+        "ijson"
     ]
 )
\ No newline at end of file
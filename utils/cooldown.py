@@ -1,18 +1,32 @@
-from expiringdict import ExpiringDict
+from utils.ttldict import TTLDict
 import time
+from typing import Optional
 
 class CooldownController:
+    __slots__ = ('cooldowns', '_max_age')
+
     def __init__(self):
-        self.cooldowns = ExpiringDict(max_len=100, max_age_seconds=5)
+        self._max_age = 5
+        self.cooldowns = TTLDict(max_len=100, max_age_seconds=self._max_age)
 
     def check(self, user_id: str, command: str) -> bool:
         key = f"{user_id}:{command}"
         return key in self.cooldowns
 
-    def remaining(self, user_id: str, command: str) -> int:
+    def remaining(self, user_id: str, command: str) -> float:
+        key = f"{user_id}:{command}"
+        return self.cooldowns[key] - time.monotonic()
+
+    def status(self, user_id: str, command: str) -> Optional[float]:
+        """Seconds left on the cooldown, or None if the command is ready"""
         key = f"{user_id}:{command}"
-        return self.cooldowns[key] - time.time()
+        expires = self.cooldowns.get(key)
+        if expires is None:
+            return None
+        remaining = expires - time.monotonic()
+        return remaining if remaining > 0 else None
 
     def update(self, user_id: str, command: str):
         key = f"{user_id}:{command}"
-        self.cooldowns[key] = time.time() + self.cooldowns.max_age
\ No newline at end of file
+        # Stored deadlines share TTLDict's monotonic clock
+        self.cooldowns[key] = time.monotonic() + self._max_age
\ No newline at end of file
@@ -1,4 +1,9 @@
+_ERR_PREFIX = "❌ Error: "
+
+
 class CommandResponse:
+    __slots__ = ('lines',)
+
     def __init__(self):
         self.lines = []
 
@@ -6,10 +11,10 @@ class CommandResponse:
         self.lines.append(content)
         return self
     def add_error(self, message: str):
-        self.lines.append(f"❌ Error: {message}")
+        self.lines.append(f"{_ERR_PREFIX}{message}")
         return self
     def overwrite_error(self, message:str):
-        self.lines = [f"❌ Error: {message}"]
+        self.lines = [f"{_ERR_PREFIX}{message}"]
         return self
     def add_header(self, content:str):
         self.lines.append(f"*{content}* ")
@@ -0,0 +1,66 @@
+import time
+from collections.abc import MutableMapping
+
+
+class TTLDict(MutableMapping):
+    """Mapping whose entries expire max_age_seconds after they are set.
+
+    Expiry is checked lazily when a key is read, and no lock is taken since the
+    bot runs on a single event loop.
+    """
+
+    def __init__(self, max_len: int, max_age_seconds: float):
+        self.max_len = max_len
+        self.max_age = max_age_seconds
+        self._d = {}  # key -> (expires_at, value), oldest first
+
+    def __setitem__(self, key, value):
+        d = self._d
+        # Re-inserting moves the key to the end so insertion order stays expiry order
+        d.pop(key, None)
+        if len(d) >= self.max_len:
+            self._evict()
+        d[key] = (time.monotonic() + self.max_age, value)
+
+    def __getitem__(self, key):
+        expires, value = self._d[key]
+        if expires <= time.monotonic():
+            del self._d[key]
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key):
+        del self._d[key]
+
+    def __iter__(self):
+        now = time.monotonic()
+        # Snapshot so callers may modify the mapping while iterating
+        for key, (expires, _) in list(self._d.items()):
+            if expires > now:
+                yield key
+
+    def __len__(self):
+        now = time.monotonic()
+        return sum(1 for expires, _ in self._d.values() if expires > now)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def _evict(self):
+        # Expired entries sit at the front; if none have expired, drop the oldest
+        d = self._d
+        now = time.monotonic()
+        while d:
+            key = next(iter(d))
+            if d[key][0] > now:
+                break
+            del d[key]
+        if len(d) >= self.max_len:
+            del d[next(iter(d))]